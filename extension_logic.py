@@ -2,48 +2,129 @@
 # Main logic for the Fast Start Blender Extension, using bundled qtfaststart.
 
 import bpy
+import concurrent.futures
+import logging
 import os
-import re
+import stat
+import struct
 from bpy.props import BoolProperty, StringProperty
 from bpy.types import PropertyGroup, AddonPreferences
 from bpy.app.handlers import persistent
 
-# Imports for bundled qtfaststart using relative import
-from .qtfaststart_lib import process as qtfaststart_process
-from .qtfaststart_lib import FastStartSetupError, MalformedFileError, UnsupportedFormatError
-
 # --- Module-level globals ---
-_render_job_cancelled_by_addon = False
-_active_handlers_info = []
+class _FastStartState:
+    """Mutable state shared across the render handlers.
+
+    A __slots__ instance keeps the per-handler access to one LOAD_GLOBAL
+    plus a slot read, instead of global-declaration bookkeeping in every
+    writer.
+    """
+    __slots__ = ('cancelled',)
+
+    def __init__(self):
+        self.cancelled = False
+
+_STATE = _FastStartState()
+# Installed handlers: func -> bpy.app.handlers attribute name. Keyed by the
+# function so membership checks during reload cycles are one dict probe.
+_active_handlers = {}
+_encoding_panel_ref = None  # bpy.types.RENDER_PT_encoding, resolved once in register()
+_registered = False  # True only after register() ran to completion
+# Whether FFmpegSettings exposes use_autosplit; probed once on the type in
+# register() so handlers and the draw callback skip per-call hasattr checks
+_has_autosplit = False
 
 _DEFAULT_SUFFIX = "-faststart"
-_FALLBACK_PACKAGE_NAME = "BL_FastStart"  # matches manifest id; only used if __package__ is unset
+# The fallback matches the manifest id; only used if __package__ is unset.
+# Resolved once — the module layout cannot change at runtime.
+_PACKAGE_NAME = __package__ or "BL_FastStart"
+
+# Single translation table covering both sanitize passes: filesystem-reserved
+# characters map to '_', control characters are dropped
+_SUFFIX_TRANS = str.maketrans(
+    {c: '_' for c in '<>:"/\\|?*'} | {chr(c): None for c in range(0x20)}
+)
+
+# Containers that support the fast start rewrite
+_FFMPEG_CONTAINERS = frozenset(('MPEG4', 'QUICKTIME'))
+
+# %-style logging defers message formatting until a record is actually emitted,
+# unlike the eager f-string print() calls this module used to make per render
+_log = logging.getLogger(__name__)
 
 # --- Helpers ---
-def _is_faststart_format(scene):
-    """Check if scene output is set to FFMPEG with MP4 or QuickTime container."""
-    return (scene.render.image_settings.file_format == 'FFMPEG'
-            and scene.render.ffmpeg.format in {'MPEG4', 'QUICKTIME'})
-
-def _has_incompatible_features(scene):
-    """Check if multiview or autosplit is enabled (incompatible with fast start)."""
-    if scene.render.use_multiview:
-        return True
-    if hasattr(scene.render.ffmpeg, "use_autosplit") and scene.render.ffmpeg.use_autosplit:
-        return True
-    return False
+def _should_process(scene):
+    """Single guard for the render handlers: enabled, right format, no conflicts.
+
+    Each RNA read crosses into Blender's C side, so the cheapest checks run
+    first and the chain bails as early as possible.
+    """
+    settings = scene.fast_start_settings_prop
+    if not settings or not settings.use_faststart_prop:
+        return False
+    render = scene.render
+    if render.image_settings.file_format != 'FFMPEG':
+        return False
+    ffmpeg = render.ffmpeg
+    if ffmpeg.format not in _FFMPEG_CONTAINERS:
+        return False
+    if render.use_multiview:
+        return False
+    return not (_has_autosplit and ffmpeg.use_autosplit)
+
+def _stat_or_none(path):
+    """Return os.stat(path) or None, avoiding separate exists/isdir/getsize syscalls."""
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
 
 def _sanitize_suffix(raw_suffix):
     """Sanitize a user-provided suffix, returning _DEFAULT_SUFFIX if result is empty."""
-    sanitized = raw_suffix.replace("..", "")
-    sanitized = re.sub(r'[<>:"/\\|?*]', '_', sanitized)
-    sanitized = re.sub(r'[\x00-\x1F]', '', sanitized)
+    sanitized = raw_suffix.replace("..", "").translate(_SUFFIX_TRANS)
     if not sanitized.strip():
         sanitized = _DEFAULT_SUFFIX
     elif sanitized != raw_suffix:
-        print(f"Fast Start: Suffix sanitized from '{raw_suffix}' to '{sanitized}'")
+        _log.info("Fast Start: Suffix sanitized from '%s' to '%s'", raw_suffix, sanitized)
     return sanitized
 
+# Sanitized suffix cached across renders; None means "recompute on next use"
+_cached_suffix = None
+
+# Resolved AddonPreferences instance; the addons[...] collection lookup is a
+# linear RNA scan, so do it once per session and drop it on unregister
+_cached_prefs = None
+
+# Rendered-file path resolved in render_init, keyed by scene.as_pointer();
+# saves render_complete a second frame_path() template expansion
+_pending_paths = {}
+
+# (path, mtime_ns, size) of the last file handed to the worker. Blender can
+# fire render_complete more than once for the same output (e.g. re-rendering
+# without changes); an unchanged file needs no second rewrite.
+_last_submitted = None
+
+def _get_prefs():
+    """Return this add-on's preferences, or None if they can't be resolved."""
+    global _cached_prefs
+    if _cached_prefs is None:
+        try:
+            _cached_prefs = bpy.context.preferences.addons[_PACKAGE_NAME].preferences
+        except (KeyError, AttributeError):
+            _log.warning("Fast Start WARNING: Could not retrieve add-on preferences")
+            return None
+    return _cached_prefs
+
+def _on_suffix_update(self, context):
+    """Re-sanitize the suffix when the preference changes, off the render path."""
+    global _cached_suffix
+    user_suffix = (self.faststart_suffix_prop or "").strip()
+    _cached_suffix = _sanitize_suffix(user_suffix) if user_suffix else _DEFAULT_SUFFIX
+
+def _on_debug_update(self, context):
+    """Switch the module logger between INFO (default) and DEBUG."""
+    _log.setLevel(logging.DEBUG if self.debug_logging_prop else logging.INFO)
+
 # --- Add-on Preferences ---
 class FastStartAddonPreferences(AddonPreferences):
     bl_idname = __package__  # reassigned in register() to the resolved package name
@@ -53,11 +134,20 @@ class FastStartAddonPreferences(AddonPreferences):
         description="Suffix for the fast start file (e.g., '-faststart', '_optimized'). Applied globally. Invalid characters will be replaced. If blank, defaults to '-faststart'.",
         default="-faststart",
         maxlen=128,
+        update=_on_suffix_update,
+    )
+
+    debug_logging_prop: BoolProperty(
+        name="Debug Logging",
+        description="Log extra Fast Start diagnostics to the console",
+        default=False,
+        update=_on_debug_update,
     )
 
     def draw(self, context):
         layout = self.layout
         layout.prop(self, "faststart_suffix_prop")
+        layout.prop(self, "debug_logging_prop")
 
 # --- Define a Property Group (Scene-specific settings) ---
 class FastStartSettingsGroup(PropertyGroup):
@@ -69,15 +159,21 @@ class FastStartSettingsGroup(PropertyGroup):
 
 # --- UI Panel Drawing Function ---
 def draw_faststart_checkbox_ui(self, context):
-    scene = context.scene
-    addon_settings = scene.fast_start_settings_prop
-
-    if not _is_faststart_format(scene):
+    # Runs on every redraw of the encoding panel, so reject non-FFMPEG
+    # output with as few RNA reads as possible before doing anything else.
+    render = context.scene.render
+    if render.image_settings.file_format != 'FFMPEG':
+        return
+    ffmpeg = render.ffmpeg
+    if ffmpeg.format not in _FFMPEG_CONTAINERS:
         return
 
     layout = self.layout
+    addon_settings = context.scene.fast_start_settings_prop
 
-    if not addon_settings or not hasattr(addon_settings, "use_faststart_prop"):
+    # The property is declared on the registered class, so a resolvable
+    # pointer implies it exists — no per-redraw hasattr probe needed
+    if not addon_settings:
         layout.row(align=True).label(text="Fast Start Prop Missing!", icon='ERROR')
         return
 
@@ -85,237 +181,402 @@ def draw_faststart_checkbox_ui(self, context):
     checkbox_text = "Fast Start (moov atom to front)"
     can_enable = True
 
-    if scene.render.use_multiview:
+    if render.use_multiview:
         can_enable = False
         checkbox_text = "Fast Start (disabled due to Stereoscopy/Multiview)"
-    elif hasattr(scene.render.ffmpeg, "use_autosplit") and scene.render.ffmpeg.use_autosplit:
+    elif _has_autosplit and ffmpeg.use_autosplit:
         can_enable = False
         checkbox_text = "Fast Start (disabled due to Autosplit)"
 
     row.enabled = can_enable
     row.prop(addon_settings, "use_faststart_prop", text=checkbox_text)
 
-# --- QTFASTSTART Processing Logic ---
+# Bundled qtfaststart symbols, imported on first render rather than at addon
+# enable: users rendering PNG/EXR never pay the parser's import cost
+_qt = None
+
+def _ensure_qtfaststart():
+    """Import the bundled qtfaststart lazily and cache its symbols."""
+    global _qt
+    if _qt is None:
+        from .qtfaststart_lib import (process, FastStartSetupError,
+                                      MalformedFileError, UnsupportedFormatError)
+        _qt = (process, FastStartSetupError, MalformedFileError,
+               UnsupportedFormatError)
+    return _qt
+
+def _is_already_faststart(path):
+    """Probe the first two atom headers: ftyp followed directly by moov means
+    the file is already fast start, without parsing the rest of it."""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(8)
+            if len(header) < 8:
+                return False
+            size, atom_type = struct.unpack('>L4s', header)
+            if atom_type != b'ftyp' or size < 8:
+                return False
+            f.seek(size)
+            header = f.read(8)
+            if len(header) < 8:
+                return False
+            return struct.unpack('>L4s', header)[1] == b'moov'
+    except OSError:
+        return False
+
+# Output directories already confirmed to exist this session; the common case
+# is every render landing in the same directory, so this turns the per-render
+# exists+makedirs stat pair into a set lookup
+_known_dirs = set()
+
 def run_qtfaststart_processing(input_path_str, output_path_str):
     """Process video file with qtfaststart, creating fast-start version."""
-    if not os.path.exists(input_path_str):
-        print(f"Fast Start ERROR: Input file not found: {input_path_str}")
+    input_stat = _stat_or_none(input_path_str)
+    if input_stat is None:
+        _log.error("Fast Start ERROR: Input file not found: %s", input_path_str)
         return False
-    
-    if os.path.isdir(input_path_str):
-        print(f"Fast Start ERROR: Input path is a directory: {input_path_str}")
+
+    if not stat.S_ISREG(input_stat.st_mode):
+        _log.error("Fast Start ERROR: Input path is not a regular file: %s", input_path_str)
+        return False
+
+    # Two 8-byte reads instead of letting qtfaststart index the whole file
+    # only to raise FastStartSetupError at the end
+    if _is_already_faststart(input_path_str):
+        _log.info("Fast Start: File already optimized, skipping")
         return False
 
     # Create output directory if needed
     output_dir = os.path.dirname(output_path_str)
-    if output_dir and not os.path.exists(output_dir):
+    if output_dir and output_dir not in _known_dirs:
         try:
             os.makedirs(output_dir, exist_ok=True)
         except Exception as e:
-            print(f"Fast Start ERROR: Could not create output directory '{output_dir}': {e}")
+            _log.error("Fast Start ERROR: Could not create output directory '%s': %s", output_dir, e)
             return False
+        if len(_known_dirs) >= 64:
+            _known_dirs.clear()
+        _known_dirs.add(output_dir)
 
+    (qtfaststart_process, setup_error,
+     malformed_error, unsupported_error) = _ensure_qtfaststart()
     try:
         qtfaststart_process(input_path_str, output_path_str)
-        
-        if os.path.exists(output_path_str) and os.path.getsize(output_path_str) > 0:
-            print(f"Fast Start: Created optimized file: {os.path.basename(output_path_str)}")
+
+        output_stat = _stat_or_none(output_path_str)
+        if output_stat is not None and output_stat.st_size > 0:
+            _log.info("Fast Start: Created optimized file: %s", os.path.basename(output_path_str))
             return True
         else:
-            print(f"Fast Start ERROR: Output file not created or empty")
+            _log.error("Fast Start ERROR: Output file not created or empty")
             return False
-            
-    except FastStartSetupError:
-        print("Fast Start: File already optimized, skipping")
+
+    except setup_error:
+        _log.info("Fast Start: File already optimized, skipping")
         return False
-    except (MalformedFileError, UnsupportedFormatError, FileNotFoundError) as e:
-        print(f"Fast Start ERROR: {e}")
+    except (malformed_error, unsupported_error, FileNotFoundError) as e:
+        _log.error("Fast Start ERROR: %s", e)
         return False
     except Exception as e:
-        print(f"Fast Start ERROR: Unexpected error during processing: {e}")
+        _log.error("Fast Start ERROR: Unexpected error during processing: %s", e)
         return False
 
+# --- Background processing ---
+# Single worker so the render_complete handler never blocks on the mdat copy;
+# qtfaststart only touches the filesystem, so it is safe off the main thread.
+_fs_executor = None
+
+def _get_executor():
+    """Return the shared single-worker executor, creating it on first use."""
+    global _fs_executor
+    if _fs_executor is None:
+        _fs_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="faststart")
+    return _fs_executor
+
+def _process_and_cleanup(input_path_str, output_path_str):
+    """Worker-thread body: run qtfaststart, remove an empty leftover on failure.
+
+    Must not touch bpy — Blender's Python API is not thread-safe.
+    """
+    success = run_qtfaststart_processing(input_path_str, output_path_str)
+    if not success:
+        leftover_stat = _stat_or_none(output_path_str)
+        if leftover_stat is not None and leftover_stat.st_size == 0:
+            try:
+                os.remove(output_path_str)
+            except OSError:
+                pass
+    return success
+
 # --- Application Handlers ---
 @persistent
 def on_render_init_faststart(scene, depsgraph=None):
     """Called when render job is initialized - validate settings."""
-    global _render_job_cancelled_by_addon
-    _render_job_cancelled_by_addon = False
+    _STATE.cancelled = False
 
-    addon_settings = scene.fast_start_settings_prop
-    if not addon_settings or not addon_settings.use_faststart_prop:
-        return
+    # Drop any stale entry from a cancelled previous job so it cannot be
+    # mistaken for this job's verdict in render_complete
+    _pending_paths.pop(scene.as_pointer(), None)
 
-    if not _is_faststart_format(scene) or _has_incompatible_features(scene):
+    if not _should_process(scene):
         return
 
     # Validate output path
     if not scene.render.filepath.strip():
-        _render_job_cancelled_by_addon = True
+        _STATE.cancelled = True
         error_message = ("Fast Start: Output path is empty. Please specify an output path in "
                          "Properties > Output Properties > Output.")
-        print(f"ERROR - {error_message}")
+        _log.error("ERROR - %s", error_message)
         raise RuntimeError(error_message)
 
+    # Resolve the output path now; the frame range and filepath template
+    # cannot change mid-job, so render_complete can reuse this
+    try:
+        _pending_paths[scene.as_pointer()] = bpy.path.abspath(
+            scene.render.frame_path(frame=scene.frame_start)
+        )
+    except Exception:
+        pass  # render_complete falls back to resolving it itself
+
 @persistent
 def check_output_path_pre_render_faststart(scene, depsgraph=None):
     """Pre-render check for cancellation flag."""
-    if _render_job_cancelled_by_addon:
+    if _STATE.cancelled:
         raise RuntimeError("Render job cancelled by Fast Start extension due to empty output path.")
 
 @persistent
 def post_render_faststart_handler(scene, depsgraph=None):
     """Main post-render handler - creates fast-start version of rendered file."""
-    global _render_job_cancelled_by_addon
-    
-    if _render_job_cancelled_by_addon:
+    if _STATE.cancelled:
         return
 
-    # Check if Fast Start is enabled and applicable
-    addon_settings = scene.fast_start_settings_prop
-    if not addon_settings or not addon_settings.use_faststart_prop:
-        return
+    # render_init already ran the eligibility guard and resolved the path —
+    # none of the checked properties can change mid-job, so a stashed entry
+    # doubles as the verdict. Only jobs render_init never saw (e.g. the
+    # addon was enabled mid-job) redo the RNA checks here.
+    rendered_filepath = _pending_paths.pop(scene.as_pointer(), None)
+    if rendered_filepath is None:
+        if not _should_process(scene):
+            return
+        try:
+            rendered_filepath = bpy.path.abspath(
+                scene.render.frame_path(frame=scene.frame_start)
+            )
+        except Exception as e:
+            _log.error("Fast Start ERROR: Could not resolve output path: %s", e)
+            return
 
-    if not _is_faststart_format(scene) or _has_incompatible_features(scene):
+    # Verify the rendered file exists
+    rendered_stat = _stat_or_none(rendered_filepath)
+    if rendered_stat is None or stat.S_ISDIR(rendered_stat.st_mode):
+        _log.error("Fast Start ERROR: Could not find rendered file: %s", rendered_filepath)
         return
 
-    # Get suffix from preferences
-    addon_package_name = __package__ or _FALLBACK_PACKAGE_NAME
-    try:
-        addon_prefs = bpy.context.preferences.addons[addon_package_name].preferences
-    except KeyError:
-        addon_prefs = None
-        print(f"Fast Start WARNING: Could not retrieve add-on preferences")
-
-    custom_suffix = _DEFAULT_SUFFIX
-    if addon_prefs and hasattr(addon_prefs, 'faststart_suffix_prop'):
-        user_suffix = (addon_prefs.faststart_suffix_prop or "").strip()
-        if user_suffix:
-            custom_suffix = _sanitize_suffix(user_suffix)
-
-    # Get the rendered file path using Blender's own API
-    try:
-        rendered_filepath = bpy.path.abspath(
-            scene.render.frame_path(frame=scene.frame_start)
-        )
-    except Exception as e:
-        print(f"Fast Start ERROR: Could not resolve output path: {e}")
+    # Debounce: skip if this exact file was already submitted unchanged
+    global _last_submitted
+    signature = (rendered_filepath, rendered_stat.st_mtime_ns, rendered_stat.st_size)
+    if signature == _last_submitted:
+        _log.debug("Fast Start: %s unchanged since last run, skipping", rendered_filepath)
         return
 
-    # Verify the rendered file exists
-    if not os.path.isfile(rendered_filepath):
-        print(f"Fast Start ERROR: Could not find rendered file: {rendered_filepath}")
-        return
+    # Get suffix from preferences (sanitized copy is cached across renders and
+    # invalidated by the property's update callback)
+    global _cached_suffix
+    if _cached_suffix is not None:
+        custom_suffix = _cached_suffix
+    else:
+        addon_prefs = _get_prefs()
+        raw_suffix = getattr(addon_prefs, 'faststart_suffix_prop', None) if addon_prefs else None
+        user_suffix = raw_suffix.strip() if raw_suffix else ''
+        custom_suffix = _sanitize_suffix(user_suffix) if user_suffix else _DEFAULT_SUFFIX
+        _cached_suffix = custom_suffix
 
     # Create fast-start version
     try:
+        # os.path handles both separators on Windows and dot-leading
+        # basenames; this runs once per render job, so clarity wins
         source_dir, source_basename = os.path.split(rendered_filepath)
         source_name, source_ext = os.path.splitext(source_basename)
-        fast_start_output_path = os.path.join(source_dir, f"{source_name}{custom_suffix}{source_ext}")
+        fast_start_output_path = os.path.join(
+            source_dir, f"{source_name}{custom_suffix}{source_ext}")
+
+        # A faststart copy no older than the render is still valid (e.g.
+        # the user re-rendered nothing); skip the whole rewrite
+        output_stat = _stat_or_none(fast_start_output_path)
+        if (output_stat is not None and output_stat.st_size > 0
+                and output_stat.st_mtime_ns >= rendered_stat.st_mtime_ns):
+            _log.info("Fast Start: %s is already up to date, skipping",
+                      os.path.basename(fast_start_output_path))
+            return
+
+        # Hand the copy off to the worker thread; the handler (and with it
+        # Blender's UI) returns immediately instead of waiting out the rewrite
+        _get_executor().submit(_process_and_cleanup, rendered_filepath, fast_start_output_path)
+        _last_submitted = signature
 
-        success = run_qtfaststart_processing(rendered_filepath, fast_start_output_path)
-        
-        if not success and os.path.exists(fast_start_output_path) and os.path.getsize(fast_start_output_path) == 0:
-            try:
-                os.remove(fast_start_output_path)
-            except OSError:
-                pass
-                
     except Exception as e:
-        print(f"Fast Start ERROR: {e}")
+        _log.error("Fast Start ERROR: %s", e)
 
 # --- Registration ---
 classes_to_register = (
     FastStartAddonPreferences,
     FastStartSettingsGroup,
 )
+_classes_reversed = classes_to_register[::-1]  # teardown order, computed once
+
+# Handler wiring: attribute name on bpy.app.handlers -> callback. The lists
+# themselves are always reachable through bpy.app.handlers, so only the names
+# are stored and nothing here keeps a reference to Blender's globals.
+_HANDLER_SPECS = (
+    ("render_init", on_render_init_faststart),
+    ("render_pre", check_output_path_pre_render_faststart),
+    ("render_complete", post_render_faststart_handler),
+)
 
 def register():
     """Register the addon classes and handlers."""
-    global _active_handlers_info
-    _active_handlers_info.clear()
+    global _registered
+    _active_handlers.clear()
+
+    try:
+        _register_body()
+    except Exception:
+        # Unwind whatever did get set up so a failed enable leaves no
+        # partial state behind for the next register()/unregister()
+        _registered = True
+        unregister()
+        raise
+    _registered = True
+
+def _register_body():
+    """The registration steps proper; register() wraps this with rollback."""
+    global _encoding_panel_ref, _has_autosplit
+
+    # Probe the RNA type once instead of hasattr-ing every scene.render.ffmpeg
+    _has_autosplit = hasattr(bpy.types.FFmpegSettings, "use_autosplit")
+
+    # Keep behaviour of the old print() calls: INFO and above reach the
+    # console; the Debug Logging preference drops the level to DEBUG
+    if not _log.handlers:
+        _handler = logging.StreamHandler()
+        _handler.setFormatter(logging.Formatter("%(message)s"))
+        _log.addHandler(_handler)
+        _log.propagate = False
+    _log.setLevel(logging.INFO)
     
-    package_name = __package__ or _FALLBACK_PACKAGE_NAME
-    FastStartAddonPreferences.bl_idname = package_name
+    FastStartAddonPreferences.bl_idname = _PACKAGE_NAME
     
-    # Register classes
+    # Register classes. Check registration state up front instead of catching
+    # the ValueError from an already-registered class — the re-enable path is
+    # the common one during development and should not raise at all.
     for cls in classes_to_register:
         try:
-            bpy.utils.register_class(cls)
-        except ValueError:
-            # Already registered, try to re-register
-            try:
+            if getattr(cls, "is_registered", False):
                 bpy.utils.unregister_class(cls)
-                bpy.utils.register_class(cls)
-            except Exception as e:
-                print(f"Fast Start: Could not re-register {cls.__name__}: {e}")
+            bpy.utils.register_class(cls)
         except Exception as e:
-            print(f"Fast Start: Error registering {cls.__name__}: {e}")
+            _log.error("Fast Start: Error registering %s: %s", cls.__name__, e)
+
+    # Restore a persisted Debug Logging preference — the property's update
+    # callback only fires on user toggles, not on enable or restart
+    prefs = _get_prefs()
+    if prefs is not None and getattr(prefs, "debug_logging_prop", False):
+        _log.setLevel(logging.DEBUG)
 
     # Add property group to Scene
     try:
         bpy.types.Scene.fast_start_settings_prop = bpy.props.PointerProperty(type=FastStartSettingsGroup)
     except Exception as e:
-        print(f"Fast Start: Error adding PropertyGroup: {e}")
+        _log.error("Fast Start: Error adding PropertyGroup: %s", e)
 
-    # Add UI to render panel
-    try:
-        if hasattr(bpy.types, "RENDER_PT_encoding"):
-            try:
-                bpy.types.RENDER_PT_encoding.remove(draw_faststart_checkbox_ui)
-            except Exception:
-                pass
-            bpy.types.RENDER_PT_encoding.append(draw_faststart_checkbox_ui)
-    except Exception as e:
-        print(f"Fast Start: Error adding UI: {e}")
-
-    # Register handlers
-    handler_definitions = [
-        ("render_init", bpy.app.handlers.render_init, on_render_init_faststart),
-        ("render_pre", bpy.app.handlers.render_pre, check_output_path_pre_render_faststart),
-        ("render_complete", bpy.app.handlers.render_complete, post_render_faststart_handler)
-    ]
-    
-    for name, handler_list, func in handler_definitions:
-        if func not in handler_list:
+    # Add UI to render panel (resolve the panel class once; unregister()
+    # reuses the cached reference instead of going through bpy.types again)
+    _encoding_panel_ref = getattr(bpy.types, "RENDER_PT_encoding", None)
+    if _encoding_panel_ref is not None:
+        try:
+            # Blender keeps appended callbacks on draw._draw_funcs; only
+            # append when absent instead of the remove-then-append dance
+            draw_funcs = getattr(_encoding_panel_ref.draw, "_draw_funcs", None) or ()
+            if draw_faststart_checkbox_ui not in draw_funcs:
+                _encoding_panel_ref.append(draw_faststart_checkbox_ui)
+        except Exception as e:
+            _log.error("Fast Start: Error adding UI: %s", e)
+
+    # Register handlers (walk bpy -> app -> handlers once, not per handler)
+    app_handlers = bpy.app.handlers
+    for name, func in _HANDLER_SPECS:
+        handler_list = getattr(app_handlers, name)
+        # Membership by identity: `func not in handler_list` compares every
+        # entry (other add-ons' handlers included) with __eq__ each
+        existing = {id(f) for f in handler_list}
+        if id(func) not in existing:
             try:
                 handler_list.append(func)
             except Exception as e:
-                print(f"Fast Start: Error adding handler {func.__name__}: {e}")
-        _active_handlers_info.append((name, handler_list, func))
+                _log.error("Fast Start: Error adding handler %s: %s", func.__name__, e)
+        _active_handlers[func] = name
 
 def unregister():
     """Unregister the addon classes and handlers."""
-    global _render_job_cancelled_by_addon, _active_handlers_info
+    global _cached_suffix, _cached_prefs, _fs_executor, _registered, \
+        _last_submitted
 
-    # Remove handlers
-    for name, handler_list, func in reversed(_active_handlers_info):
-        if func in handler_list:
+    # Nothing to undo if register() never completed (failed enable, double
+    # disable) — avoids the noisy partial-teardown path entirely
+    if not _registered:
+        return
+    _registered = False
+
+    # Let any in-flight fast start finish in the background, but stop
+    # accepting new work
+    if _fs_executor is not None:
+        _fs_executor.shutdown(wait=False)
+        _fs_executor = None
+
+    # Remove handlers (locate by identity instead of list.remove's __eq__ scan)
+    app_handlers = bpy.app.handlers
+    for func, name in reversed(_active_handlers.items()):
+        handler_list = getattr(app_handlers, name)
+        existing_idx = {id(f): i for i, f in enumerate(handler_list)}
+        idx = existing_idx.get(id(func))
+        if idx is not None:
             try:
-                handler_list.remove(func)
+                del handler_list[idx]
             except Exception as e:
-                print(f"Fast Start: Error removing handler {func.__name__}: {e}")
-    _active_handlers_info.clear()
+                _log.error("Fast Start: Error removing handler %s: %s", func.__name__, e)
+    _active_handlers.clear()
 
     # Remove UI
-    try:
-        if hasattr(bpy.types, "RENDER_PT_encoding"):
-            bpy.types.RENDER_PT_encoding.remove(draw_faststart_checkbox_ui)
-    except Exception:
-        pass
+    global _encoding_panel_ref
+    panel = _encoding_panel_ref or getattr(bpy.types, "RENDER_PT_encoding", None)
+    if panel is not None:
+        try:
+            panel.remove(draw_faststart_checkbox_ui)
+        except Exception:
+            pass
+    _encoding_panel_ref = None
 
-    # Remove property group
-    if hasattr(bpy.types.Scene, 'fast_start_settings_prop'):
+    # Remove property group (hasattr is just a try/except around getattr —
+    # do the single getattr ourselves and delete on a hit)
+    scene_type = bpy.types.Scene
+    if getattr(scene_type, 'fast_start_settings_prop', None) is not None:
         try:
-            del bpy.types.Scene.fast_start_settings_prop
+            del scene_type.fast_start_settings_prop
         except Exception as e:
-            print(f"Fast Start: Error removing PropertyGroup: {e}")
+            _log.error("Fast Start: Error removing PropertyGroup: %s", e)
 
-    # Unregister classes
-    for cls in reversed(classes_to_register):
-        try:
-            bpy.utils.unregister_class(cls)
-        except Exception:
-            pass
+    # Unregister classes (skip ones that never made it through register())
+    for cls in _classes_reversed:
+        if getattr(cls, "is_registered", False):
+            try:
+                bpy.utils.unregister_class(cls)
+            except Exception:
+                pass
 
-    _render_job_cancelled_by_addon = False
\ No newline at end of file
+    _STATE.cancelled = False
+    _cached_suffix = None
+    _cached_prefs = None
+    _last_submitted = None
+    _known_dirs.clear()
+    _pending_paths.clear()
\ No newline at end of file
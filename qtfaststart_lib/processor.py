@@ -10,6 +10,14 @@ import struct
 import collections
 
 import io
+import mmap
+
+# Optional: Blender's Python bundles numpy; the struct loop below remains as
+# the fallback for bare interpreters
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 from .exceptions import FastStartSetupError
 from .exceptions import MalformedFileError
@@ -18,17 +26,28 @@ from .exceptions import FastStartException
 
 CHUNK_SIZE = 8192
 
+# Bulk atom copies use much larger chunks than the historic CHUNK_SIZE —
+# fewer read/write round-trips when sendfile is unavailable
+COPY_CHUNK_SIZE = 1024 * 1024
+
 log = logging.getLogger("qtfaststart")
 
 Atom = collections.namedtuple('Atom', 'name position size')
 
+# Precompiled formats: struct.unpack(fmt, ...) re-parses the format string on
+# every call (the internal cache still costs a dict probe), while a Struct
+# method skips straight to conversion. These run once per atom in the file.
+_ATOM_HEADER = struct.Struct(">L4s")
+_UINT64 = struct.Struct(">Q")
+_VERSION_COUNT = struct.Struct(">2L")
+
 def read_atom(datastream):
     """
         Read an atom and return a tuple of (size, type) where size is the size
         in bytes (including the 8 bytes already read) and type is a "fourcc"
         like "ftyp" or "moov".
     """
-    size, atom_type = struct.unpack(">L4s", datastream.read(8))
+    size, atom_type = _ATOM_HEADER.unpack(datastream.read(8))
     atom_type = atom_type.decode('ascii')
     return size, atom_type
 
@@ -40,7 +59,7 @@ def _read_atom_ex(datastream):
     pos = datastream.tell()
     atom_size, atom_type = read_atom(datastream)
     if atom_size == 1:
-        atom_size, = struct.unpack(">Q", datastream.read(8))
+        atom_size, = _UINT64.unpack(datastream.read(8))
     return Atom(atom_type, pos, atom_size)
 
 
@@ -172,7 +191,20 @@ def process(infilename, outfilename, limit=float('inf'), to_end=False,
         If cleanup is set to False, free atoms and zero atoms will not be
         scrubbed from from the mov
     """
-    with open(infilename, "rb") as datastream:
+    infile = open(infilename, "rb")
+    datastream = infile
+    try:
+        # Map the input so the atom-header reads and seeks done while
+        # indexing are page-cache memory accesses rather than read()
+        # syscalls. mmap objects support read/seek/tell, so the rest of
+        # the code is agnostic to which one it got.
+        try:
+            datastream = mmap.mmap(infile.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty or unmappable input — parse through the file object
+            datastream = infile
+
         # Get the top level atom index
         index = get_index(datastream)
 
@@ -225,8 +257,26 @@ def process(infilename, outfilename, limit=float('inf'), to_end=False,
         # read and fix moov
         moov = _patch_moov(datastream, moov_atom, offset)
 
+        skip_atom_types = ["ftyp", "moov"]
+        if cleanup:
+            skip_atom_types += ["free"]
+
+        atoms = [item for item in index if item.name not in skip_atom_types]
+
         log.info("Writing output...")
         with open(outfilename, "wb") as outfile:
+            if hasattr(os, "posix_fallocate") and limit in (0, float('inf')):
+                # The final size is known exactly before any byte is written;
+                # reserving it up front keeps the extents contiguous instead
+                # of growing the file one write at a time
+                expected_size = (len(moov.getbuffer())
+                                 + sum(a.size for a in index if a.name == "ftyp")
+                                 + sum(a.size for a in atoms))
+                try:
+                    os.posix_fallocate(outfile.fileno(), 0, expected_size)
+                except OSError:
+                    pass
+
             # Write ftype
             for atom in index:
                 if atom.name == "ftyp":
@@ -238,11 +288,6 @@ def process(infilename, outfilename, limit=float('inf'), to_end=False,
                 _write_moov(moov, outfile)
 
             # Write the rest
-            skip_atom_types = ["ftyp", "moov"]
-            if cleanup:
-                skip_atom_types += ["free"]
-
-            atoms = [item for item in index if item.name not in skip_atom_types]
             for atom in atoms:
                 log.debug("Writing %s... (%d bytes)" % (atom.name, atom.size))
                 datastream.seek(atom.position)
@@ -251,11 +296,15 @@ def process(infilename, outfilename, limit=float('inf'), to_end=False,
                 cur_limit = limit or float('inf')
                 cur_limit = min(cur_limit, atom.size)
 
-                for chunk in get_chunks(datastream, CHUNK_SIZE, cur_limit):
-                    outfile.write(chunk)
+                _copy_atom_data(datastream, outfile, cur_limit,
+                                in_fd=infile.fileno())
 
             if to_end:
                 _write_moov(moov, outfile)
+    finally:
+        if datastream is not infile:
+            datastream.close()
+        infile.close()
 
     # Set permissions after both files are closed
     try:
@@ -284,23 +333,116 @@ def _patch_moov(datastream, atom, offset):
         )[atom.name]
 
         # Get number of entries
-        version, entry_count = struct.unpack(">2L", moov.read(8))
+        version, entry_count = _VERSION_COUNT.unpack(moov.read(8))
 
         log.info("Patching %s with %d entries" % (atom.name, entry_count))
 
         entries_pos = moov.tell()
+        payload = moov.read(csize * entry_count)
+        if len(payload) != csize * entry_count:
+            # frombuffer would silently truncate a short-but-aligned payload
+            # to fewer entries; reject the table before either patch path
+            msg = ("%s atom claims %d entries but its payload is short" %
+                    (atom.name, entry_count))
+            log.warning(msg)
+            raise MalformedFileError(msg)
 
-        struct_fmt = ">%(entry_count)s%(ctype)s" % vars()
-
-        # Read entries
-        entries = struct.unpack(struct_fmt, moov.read(csize * entry_count))
+        patched = None
+        if numpy is not None and entry_count:
+            # One vectorized add instead of entry_count interpreter loop
+            # iterations; the array stays big-endian so there is no
+            # byteswap round-trip
+            entries = numpy.frombuffer(payload, dtype=">u%d" % csize)
+            # The add wraps silently on overflow, unlike struct.pack which
+            # raises; only vectorize when every patched entry stays in
+            # range and let the struct path below surface the error
+            if (int(entries.min()) + offset >= 0
+                    and int(entries.max()) + offset < 1 << (8 * csize)):
+                entries = entries.copy()
+                if offset >= 0:
+                    entries += entries.dtype.type(offset)
+                else:
+                    entries -= entries.dtype.type(-offset)
+                patched = entries.tobytes()
+        if patched is None:
+            struct_fmt = ">%(entry_count)s%(ctype)s" % vars()
+            entries = struct.unpack(struct_fmt, payload)
+            patched = struct.pack(struct_fmt,
+                                  *[entry + offset for entry in entries])
 
-        # Patch and write entries
-        offset_entries = [entry + offset for entry in entries]
         moov.seek(entries_pos)
-        moov.write(struct.pack(struct_fmt, *offset_entries))
+        moov.write(patched)
     return moov
 
+def _copy_atom_data(datastream, outfile, nbytes, in_fd=None):
+    """
+        Copy nbytes from datastream's current position to outfile.
+
+        When both ends are real files the copy stays in the kernel and
+        never transits Python buffers — this is the dominant cost on
+        multi-gigabyte mdat atoms. os.copy_file_range is preferred since
+        it can use filesystem-level cloning (reflinks on btrfs/XFS);
+        os.sendfile is the next choice, and the chunked read/write loop
+        covers everything else.
+
+        in_fd lets callers that wrap the input in an mmap still supply the
+        underlying descriptor for the kernel-side copy.
+    """
+    if hasattr(os, "copy_file_range") or hasattr(os, "sendfile"):
+        try:
+            if in_fd is None:
+                in_fd = datastream.fileno()
+            out_fd = outfile.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            in_fd = None
+        if in_fd is not None:
+            outfile.flush()
+            offset = datastream.tell()
+            out_pos = outfile.tell()
+            remaining = nbytes
+
+            if hasattr(os, "copy_file_range"):
+                # Explicit offsets, so neither fd's own position moves
+                try:
+                    while remaining:
+                        copied = os.copy_file_range(
+                            in_fd, out_fd, min(remaining, 0x7ffff000),
+                            offset_src=offset,
+                            offset_dst=out_pos + (nbytes - remaining))
+                        if copied == 0:
+                            break
+                        offset += copied
+                        remaining -= copied
+                except OSError:
+                    log.debug("copy_file_range failed, trying sendfile")
+
+            if remaining and hasattr(os, "sendfile"):
+                # sendfile writes at the out fd's own offset; line it up
+                # with whatever copy_file_range already transferred
+                os.lseek(out_fd, out_pos + (nbytes - remaining), os.SEEK_SET)
+                try:
+                    while remaining:
+                        sent = os.sendfile(out_fd, in_fd, offset,
+                                           min(remaining, 0x7ffff000))
+                        if sent == 0:
+                            break
+                        offset += sent
+                        remaining -= sent
+                except OSError:
+                    log.debug("sendfile failed, falling back to chunked copy")
+            # Resync the Python-level file objects with the kernel offsets.
+            # Seek to the tracked position rather than the end: with a
+            # preallocated output, end-of-file is past the write frontier.
+            datastream.seek(offset)
+            outfile.seek(out_pos + (nbytes - remaining))
+            if not remaining:
+                return
+            nbytes = remaining
+
+    for chunk in get_chunks(datastream, COPY_CHUNK_SIZE, nbytes):
+        outfile.write(chunk)
+
+
 def get_chunks(stream, chunk_size, limit):
     remaining = limit
     while remaining:
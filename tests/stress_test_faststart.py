@@ -16,6 +16,7 @@ whatever Blender actually produced — no hardcoded expected filenames.
 
 import bpy
 import os
+import time
 
 # ──────────────────────────────────────────────────────────
 # Configuration
@@ -52,6 +53,21 @@ def derive_faststart_path(rendered_path, suffix):
     return os.path.join(directory, name + suffix + ext)
 
 
+def wait_for_faststart_file(path, timeout=30.0, poll=0.25):
+    """The extension rewrites on a background worker, so the file can appear
+    a moment after render() returns. Poll until it exists with a non-zero
+    size (the worker deletes empty leftovers on failure)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if os.path.getsize(path) > 0:
+                return True
+        except OSError:
+            pass
+        time.sleep(poll)
+    return os.path.isfile(path)
+
+
 def run_stress_test():
     scene = bpy.context.scene
 
@@ -98,9 +114,9 @@ def run_stress_test():
         faststart_path = derive_faststart_path(rendered_path, SUFFIX)
         faststart_name = os.path.basename(faststart_path)
 
-        # Check existence
+        # Check existence (the faststart copy is written asynchronously)
         rendered_exists = os.path.isfile(rendered_path)
-        faststart_exists = os.path.isfile(faststart_path)
+        faststart_exists = wait_for_faststart_file(faststart_path)
 
         status = "PASS" if (rendered_exists and faststart_exists) else "FAIL"
 
@@ -0,0 +1,124 @@
+"""
+Unit tests for qtfaststart's stco/co64 patching.
+
+Unlike the stress test these need no Blender — run from the repo root:
+
+    python tests/test_patch_moov.py
+    python -m pytest tests/test_patch_moov.py
+"""
+
+import io
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qtfaststart_lib import processor
+from qtfaststart_lib.exceptions import MalformedFileError
+
+
+def _atom(name, payload):
+    return struct.pack(">L4s", 8 + len(payload), name) + payload
+
+
+def _make_moov(entries, ctype=b"stco", entry_fmt=">L", claimed_count=None):
+    """Build a minimal moov atom whose stbl holds one chunk-offset table."""
+    count = len(entries) if claimed_count is None else claimed_count
+    table = struct.pack(">2L", 0, count)
+    for entry in entries:
+        table += struct.pack(entry_fmt, entry)
+    inner = _atom(ctype, table)
+    for name in (b"stbl", b"minf", b"mdia", b"trak"):
+        inner = _atom(name, inner)
+    return _atom(b"moov", inner)
+
+
+def _patch(moov_bytes, offset):
+    atom = processor.Atom("moov", 0, len(moov_bytes))
+    return processor._patch_moov(io.BytesIO(moov_bytes), atom, offset).getvalue()
+
+
+def _read_entries(patched, count, entry_fmt=">L"):
+    size = struct.calcsize(entry_fmt)
+    table = patched[len(patched) - count * size:]
+    return [struct.unpack(entry_fmt, table[i * size:(i + 1) * size])[0]
+            for i in range(count)]
+
+
+def test_patches_offsets():
+    patched = _patch(_make_moov([100, 200, 300]), 42)
+    assert _read_entries(patched, 3) == [142, 242, 342]
+
+
+def test_negative_offset():
+    patched = _patch(_make_moov([100, 200, 300]), -50)
+    assert _read_entries(patched, 3) == [50, 150, 250]
+
+
+def test_co64_table():
+    moov = _make_moov([2 ** 33, 2 ** 34], ctype=b"co64", entry_fmt=">Q")
+    patched = _patch(moov, 7)
+    assert _read_entries(patched, 2, ">Q") == [2 ** 33 + 7, 2 ** 34 + 7]
+
+
+def test_empty_table():
+    assert _patch(_make_moov([]), 100) == _make_moov([])
+
+
+def test_numpy_and_struct_paths_match():
+    if processor.numpy is None:
+        return  # bare interpreter; only the struct path exists
+    moov = _make_moov([100, 2 ** 31, 2 ** 32 - 200])
+    saved = processor.numpy
+    try:
+        with_numpy = _patch(moov, 99)
+        negative_with_numpy = _patch(moov, -99)
+        processor.numpy = None
+        without_numpy = _patch(moov, 99)
+        negative_without_numpy = _patch(moov, -99)
+    finally:
+        processor.numpy = saved
+    assert with_numpy == without_numpy
+    assert negative_with_numpy == negative_without_numpy
+
+
+def test_overflow_raises():
+    try:
+        _patch(_make_moov([2 ** 32 - 50]), 100)
+    except struct.error:
+        pass
+    else:
+        raise AssertionError("32-bit overflow did not raise")
+
+
+def test_underflow_raises():
+    try:
+        _patch(_make_moov([10]), -100)
+    except struct.error:
+        pass
+    else:
+        raise AssertionError("negative underflow did not raise")
+
+
+def test_short_payload_raises():
+    moov = _make_moov([100], claimed_count=1000)
+    try:
+        _patch(moov, 10)
+    except MalformedFileError:
+        pass
+    else:
+        raise AssertionError("short chunk-offset payload did not raise")
+
+
+if __name__ == "__main__":
+    failures = 0
+    for _name in sorted(list(globals())):
+        if _name.startswith("test_"):
+            try:
+                globals()[_name]()
+                print("%s: ok" % _name)
+            except Exception as exc:
+                failures += 1
+                print("%s: FAILED (%s)" % (_name, exc))
+    sys.exit(1 if failures else 0)